@@ -58,8 +58,9 @@ BACKGROUND_ID = "0"
 API_ENDPOINT = f"https://{TEST_API_SERVER}/odata/v2/upsert?$format=json"
 
 # Entity Sets for API Operations
-ENTITY_SETS = [
-"User", "PerPerson", "EmpEmployment", "EmpJob", "PerPersonal", 
+# Tuples are immutable and slightly cheaper to iterate than lists.
+ENTITY_SETS: tuple = (
+"User", "PerPerson", "EmpEmployment", "EmpJob", "PerPersonal",
     #"PerGlobalInfoCHN","PerGlobalInfoCAN","PerGlobalInfoUSA","PerGlobalInfoIND","PerGlobalInfoMYS","PerGlobalInfoPHL","PerGlobalInfoSGP","PerGlobalInfoTHA","PerGlobalInfoGBR","PerGlobalInfoVNM","PerGlobalInfoKHM",
     #"EmpJobRelationships", "EmpCompensation", "EmpPayCompRecurring", "EmpPayCompNonRecurring", "EmpWorkPermit",  
     "PerNationalId", 
@@ -85,10 +86,11 @@ ENTITY_SETS = [
     #"cust_PhysicalExam","cust_PhysicalExam_item",
     #"cust_RetirementScheme","cust_RetirementScheme_item",
     #"cust_ExternalLearningHistory_Parent","cust_ExternalLearningHistory_Child"
-]
-GOListENTITY_SETS = [
+)
+
+GOListENTITY_SETS: tuple = (
     "FOLocation", "FOEventReason", "FOPayComponent", "FOPayGroup", "FOFrequency", "Bank"
-]
+)
 
 # =============================================================================
 # File Paths
@@ -112,9 +114,11 @@ POSTMAN_COLLECTION_OUTPUT = os.path.join(SCRIPT_DIR, "9.SF New Hire Postman_Coll
 MAX_SHEETNAME_LEN = 31
 
 # XML Namespaces for Metadata Parsing
+# Note: lxml rejects the empty-string prefix, so the EDM namespace is mapped
+# to the explicit 'edm' prefix.
 ns = {
     'edmx': 'http://schemas.microsoft.com/ado/2007/06/edmx',
     'm': 'http://schemas.microsoft.com/ado/2007/08/dataservices/metadata',
-    '': 'http://schemas.microsoft.com/ado/2008/09/edm',
+    'edm': 'http://schemas.microsoft.com/ado/2008/09/edm',
     'sap': 'http://www.successfactors.com/edm/sap'
 }
\ No newline at end of file
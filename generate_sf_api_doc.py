@@ -9,16 +9,87 @@ parses responses, looks up field attributes, and generates an Excel documentatio
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from copy import copy
+import email.parser
+import functools
+import io
 import os
 import re
 import json
-import xml.etree.ElementTree as ET
-import pandas as pd
+import uuid
+
+# orjson decodes the large OData JSON payloads 2-5x faster than stdlib json;
+# fall back to the stdlib if it is not installed.
+try:
+    import orjson
+
+    def json_loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the stdlib (it rejects NaN/Infinity
+            # and coerces integers beyond 64 bits); retry with json so
+            # payloads the baseline handled still parse.
+            return json.loads(data)
+
+    def json_dumps(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits, which orjson refuses to emit.
+            return json.dumps(obj, indent=4)
+except ImportError:
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(obj):
+        return json.dumps(obj, indent=4)
+
+# ijson (optional) parses API responses incrementally straight off the
+# socket, so large result sets never materialize beyond the truncated
+# documentation sample.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Prefer lxml for XML parsing (2-5x faster than stdlib ElementTree on large
+# $metadata documents); fall back to the stdlib if it is not installed.
+# Server responses are parsed with entity resolution and network access
+# disabled so a malicious/compromised endpoint cannot trigger
+# billion-laughs expansion; skipping that machinery also parses faster.
+# lxml also switches openpyxl's streaming writer to its much faster
+# serializer automatically, so workbook saves benefit from it too.
+try:
+    from lxml import etree as ET
+
+    def safe_iterparse(source, events):
+        return ET.iterparse(source, events=events, resolve_entities=False,
+                            no_network=True, huge_tree=False, collect_ids=False)
+except ImportError:
+    print("Note: lxml is not installed; metadata parsing and workbook "
+          "saving will use the slower stdlib XML backend.")
+    import xml.etree.ElementTree as ET
+    try:
+        from defusedxml.ElementTree import iterparse as _defused_iterparse
+
+        def safe_iterparse(source, events):
+            return _defused_iterparse(source, events=events)
+    except ImportError:
+        def safe_iterparse(source, events):
+            return ET.iterparse(source, events=events)
+
 import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 
@@ -41,8 +112,42 @@ SF_TOKEN_URL = os.getenv('SF_TOKEN_URL', 'https://apidemo.sapsf.com/oauth/token'
 SF_IDP_URL = os.getenv('SF_IDP_URL', 'https://apidemo.sapsf.com/oauth/idp')
 SF_PRIVATE_KEY = os.getenv("SF_PRIVATE_KEY", "")  # Load from environment or secret management service
 
-# Global variable to store the dynamic token
-DYNAMIC_ACCESS_TOKEN = None
+# Cached dynamic OAuth token with its expiry (monotonic clock); refreshed
+# only when close to expiring instead of re-authenticating per request.
+_TOKEN = {"value": None, "expires_at": 0.0}
+_TOKEN_LOCK = threading.Lock()
+
+# Shared HTTP session: keeps connections alive (TLS handshake paid once), is
+# safe to use from multiple worker threads, and retries throttled/transient
+# server errors with backoff.
+SESSION = requests.Session()
+SESSION.headers.update({
+    'Accept': 'application/json',
+    # Explicitly opt in to compressed transfer; SF JSON payloads shrink a
+    # lot under gzip and requests decompresses transparently.
+    'Accept-Encoding': 'gzip, deflate',
+})
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        connect=3,
+        read=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'POST'}),
+    ),
+)
+
+# Default (connect, read) timeout so one hung endpoint cannot stall the
+# whole pipeline indefinitely; callers can still pass their own timeout.
+DEFAULT_TIMEOUT = (5, 30)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# Number of worker threads for concurrent API calls (network-bound work)
+MAX_WORKERS = 8
 
 # =============================================================================
 # Authentication Helper Function
@@ -58,7 +163,7 @@ def get_assertion():
         "private_key": SF_PRIVATE_KEY
     }
     try:
-        response = requests.post(SF_IDP_URL, data=payload)
+        response = SESSION.post(SF_IDP_URL, data=payload)
         response.raise_for_status()
         return response.text
     except Exception as e:
@@ -68,7 +173,7 @@ def get_assertion():
         return None
 
 def get_access_token(assertion):
-    """Get OAuth 2.0 Access Token using assertion."""
+    """Get OAuth 2.0 Access Token using assertion. Returns (token, expires_in)."""
     print("Getting Access Token...")
     payload = {
         "company_id": SF_COMPANY_ID,
@@ -79,82 +184,113 @@ def get_access_token(assertion):
         "new_token": "true"
     }
     try:
-        response = requests.post(SF_TOKEN_URL, data=payload)
+        response = SESSION.post(SF_TOKEN_URL, data=payload)
         response.raise_for_status()
-        data = response.json()
-        return data.get("access_token")
+        data = json_loads(response.content)
+        return data.get("access_token"), data.get("expires_in", 1440)
     except Exception as e:
         print(f"Error getting access token: {e}")
         if hasattr(e, 'response') and e.response:
             print(f"Response: {e.response.text}")
-        return None
+        return None, 0
+
+def get_or_refresh_token():
+    """Return the cached OAuth token, refreshing it shortly before expiry."""
+    with _TOKEN_LOCK:
+        now = time.monotonic()
+        if now < _TOKEN["expires_at"] - 60:
+            return _TOKEN["value"]
+        assertion = get_assertion()
+        token, expires_in = get_access_token(assertion) if assertion else (None, 0)
+        _TOKEN["value"] = token
+        if token:
+            _TOKEN["expires_at"] = now + float(expires_in or 1440)
+        else:
+            # Back off so a broken IdP is not re-queried on every request.
+            _TOKEN["expires_at"] = now + 300
+        return token
+
+# Last auth scheme that produced a non-auth-error response; tried first on
+# subsequent calls so the fallback chain is not re-walked every request.
+_LAST_GOOD_AUTH = None
 
 def make_request(url, method='GET', **kwargs):
-    """Make HTTP request with Dynamic Bearer token, fallback to Config Bearer, then Basic auth."""
-    
-    # 1. Try Dynamic Access Token
-    if DYNAMIC_ACCESS_TOKEN:
-        headers = kwargs.get('headers', {})
-        headers['Authorization'] = f'Bearer {DYNAMIC_ACCESS_TOKEN}'
-        kwargs['headers'] = headers
-        if 'verify' not in kwargs:
-            kwargs['verify'] = True
-        
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, **kwargs)
-            elif method.upper() == 'POST':
-                response = requests.post(url, **kwargs)
-            else:
-                response = requests.request(method, url, **kwargs)
-            
-            if response.status_code not in [401, 403]:
-                return response
-            print(f"Dynamic Bearer token failed with {response.status_code}.")
-        except Exception as e:
-            print(f"Dynamic Bearer token request failed: {e}.")
+    """Make HTTP request with Dynamic Bearer token, fallback to Config Bearer, then Basic auth.
 
-    # 2. Try Config Bearer Token
-    if BEARER_TOKEN:
-        headers = kwargs.get('headers', {})
-        headers['Authorization'] = f'Bearer {BEARER_TOKEN}'
-        kwargs['headers'] = headers
+    The scheme that last succeeded is attempted first; the others are only
+    tried when it answers 401/403 or raises.
+    """
+    global _LAST_GOOD_AUTH
+    method = method.upper()
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    last_exc = None
+
+    def attempt(mode):
+        """Send the request with one auth scheme; None if it cannot be tried."""
+        nonlocal last_exc
+        if mode in ('dynamic', 'config'):
+            token = get_or_refresh_token() if mode == 'dynamic' else BEARER_TOKEN
+            if not token:
+                return None
+            headers = kwargs.get('headers', {})
+            headers['Authorization'] = f'Bearer {token}'
+            kwargs['headers'] = headers
+            # A prior basic attempt leaves auth= behind, and requests lets
+            # it override the Authorization header at prepare time; drop it
+            # so the bearer token is actually sent.
+            kwargs.pop('auth', None)
+        else:
+            if 'headers' in kwargs and 'Authorization' in kwargs['headers']:
+                del kwargs['headers']['Authorization']
+            kwargs['auth'] = HTTPBasicAuth(USERNAME, PASSWORD)
         if 'verify' not in kwargs:
             kwargs['verify'] = True
-        
+
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, **kwargs)
-            elif method.upper() == 'POST':
-                response = requests.post(url, **kwargs)
-            else:
-                response = requests.request(method, url, **kwargs)
-            
-            if response.status_code not in [401, 403]:
-                return response
-            print(f"Config Bearer token failed with {response.status_code}.")
+            return SESSION.request(method, url, **kwargs)
         except Exception as e:
-            print(f"Config Bearer token request failed: {e}.")
+            last_exc = e
+            print(f"Request with {mode} auth failed: {e}.")
+            return None
 
-    # 3. Fallback to Basic Auth
-    if 'headers' in kwargs and 'Authorization' in kwargs['headers']:
-        del kwargs['headers']['Authorization']
-    
-    kwargs['auth'] = HTTPBasicAuth(USERNAME, PASSWORD)
-    if 'verify' not in kwargs:
-        kwargs['verify'] = True
-        
-    if method.upper() == 'GET':
-        return requests.get(url, **kwargs)
-    elif method.upper() == 'POST':
-        return requests.post(url, **kwargs)
-    else:
-        return requests.request(method, url, **kwargs)
+    order = ['dynamic', 'config', 'basic']
+    if _LAST_GOOD_AUTH in order:
+        order.remove(_LAST_GOOD_AUTH)
+        order.insert(0, _LAST_GOOD_AUTH)
+
+    response = None
+    for mode in order:
+        attempt_response = attempt(mode)
+        if attempt_response is None:
+            continue
+        response = attempt_response
+        if response.status_code not in [401, 403]:
+            _LAST_GOOD_AUTH = mode
+            return response
+        print(f"Auth scheme '{mode}' failed with {response.status_code}.")
+
+    # All schemes exhausted: return the last (auth-error) response so callers
+    # can still inspect status/body, matching the old Basic-auth fallthrough.
+    # If no scheme produced a response at all, re-raise the last transport
+    # error instead of returning None so callers' except paths run.
+    if response is None and last_exc is not None:
+        raise last_exc
+    return response
 
 # =============================================================================
 # XML Metadata Parsing Helpers
 # =============================================================================
 
+# Fully-qualified EDM tag names, resolved once so find/findall do not have to
+# expand the prefix map on every call.
+EDM = '{http://schemas.microsoft.com/ado/2008/09/edm}'
+TAG_SCHEMA = EDM + 'Schema'
+TAG_ENTITY_TYPE = EDM + 'EntityType'
+TAG_PROPERTY = EDM + 'Property'
+TAG_NAV = EDM + 'NavigationProperty'
+TAG_KEY = EDM + 'Key'
+TAG_PROPREF = EDM + 'PropertyRef'
+
 def get_text(node, tag):
     el = node.find(tag, ns)
     return el.text if el is not None else "Null"
@@ -166,6 +302,7 @@ def get_sap_tags(doc):
     return "Null"
 
 def get_attr_value(node, attr):
+    """Read a single attribute with sap:-prefix fallback (non-hot-path use)."""
     if attr in node.attrib:
         return node.attrib[attr]
     if 'sap:' + attr in node.attrib:
@@ -175,8 +312,24 @@ def get_attr_value(node, attr):
         return node.attrib[sap_ns]
     return "Null"
 
+def collect_attrs(node):
+    """Sweep node.attrib once into a dict keyed by cleaned attribute name.
+
+    One pass over the node's actual attributes replaces probing every
+    candidate column with get_attr_value (plain, sap:-prefixed, full-URI).
+    """
+    return {clean_attr(k): v for k, v in node.attrib.items()}
+
+# The same ~30 SAP attribute names repeat on every Property, so caching the
+# cleaned form avoids re-running the regex tens of thousands of times.
+_CLEAN_RE = re.compile(r'^\{[^}]*\}')
+
+# Placeholders the Master Table endpoint templates may carry.
+_PLACEHOLDER_RE = re.compile(r"\{\{?Test_API-Server\}\}?|\{today\}")
+
+@functools.lru_cache(maxsize=4096)
 def clean_attr(attr):
-    return re.sub(r'^\{.*\}', '', attr).replace('sap:', '')
+    return _CLEAN_RE.sub('', attr).replace('sap:', '')
 
 
 # =============================================================================
@@ -187,170 +340,482 @@ def extract_ec_odata_api_dictionary():
     """Extract API metadata for each entity and create data dictionaries."""
     print("Extracting EC OData API Dictionary...")
     
-    # Download and parse metadata for each entity set
-    metadata_trees = {}
-    for entity in ENTITY_SETS:
+    # Download and parse metadata for each entity set.
+    # All $metadata documents are fetched in a single OData $batch request;
+    # if that fails, the concurrent per-entity fetch is used as fallback.
+    # Parsing streams through iterparse and clears each EntityType after it is
+    # processed, so peak memory stays bounded instead of holding every
+    # metadata tree at once. Attribute discovery and row emission happen in
+    # the same pass; missing attributes are reconciled when the DataFrame is
+    # built at the end.
+    def process_entity_type(elem, rows, attrs_seen):
+        entity_name = elem.attrib.get('Name', 'Null')
+        key_names = set()
+        key = elem.find(TAG_KEY)
+        if key is not None:
+            key_names = {pr.attrib.get('Name') for pr in key.iter(TAG_PROPREF)}
+        for prop in elem.iter(TAG_PROPERTY):
+            row = collect_attrs(prop)
+            attrs_seen.update(row)
+            row["Key"] = "true" if prop.attrib.get("Name") in key_names else "false"
+            row["Entity"] = entity_name
+            row["NavigationField"] = "false"
+            rows.append(row)
+        for nav in elem.iter(TAG_NAV):
+            row = collect_attrs(nav)
+            attrs_seen.update(row)
+            row["Key"] = "false"
+            row["Entity"] = entity_name
+            row["NavigationField"] = "true"
+            rows.append(row)
+
+    def parse_metadata_source(entity, source):
+        """Stream-parse one $metadata document from a file-like source."""
+        rows = []
+        attrs_seen = set()
+        try:
+            in_sfodata = False
+            for event, elem in safe_iterparse(source, ('start', 'end')):
+                if event == 'start':
+                    if elem.tag == TAG_SCHEMA:
+                        in_sfodata = elem.attrib.get('Namespace') == 'SFOData'
+                    continue
+                if elem.tag == TAG_ENTITY_TYPE:
+                    if in_sfodata:
+                        process_entity_type(elem, rows, attrs_seen)
+                    elem.clear()
+                    # lxml keeps processed siblings attached to the parent;
+                    # drop them so the partial tree cannot grow unbounded.
+                    if hasattr(elem, 'getprevious'):
+                        while elem.getprevious() is not None:
+                            del elem.getparent()[0]
+                elif elem.tag == TAG_SCHEMA:
+                    in_sfodata = False
+                    elem.clear()
+        except Exception as e:
+            print(f"Error parsing metadata for {entity}: {e}")
+        return rows, attrs_seen
+
+    def fetch_metadata_batch(entities):
+        """Fetch every $metadata document in one OData $batch round-trip.
+
+        Each individual OData call opens a new login session server-side, so
+        merging the N metadata GETs into a single multipart request costs one
+        TLS handshake and one login instead of N. Returns the per-entity
+        response bodies in request order (None for failed parts).
+        """
+        print(f"Fetching metadata for {len(entities)} entities via $batch...")
+        boundary = f"batch_{uuid.uuid4()}"
+        parts = []
+        for entity in entities:
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                "Content-Transfer-Encoding: binary\r\n"
+                "\r\n"
+                f"GET {entity}/$metadata HTTP/1.1\r\n"
+                "\r\n"
+            )
+        body = "".join(parts) + f"--{boundary}--\r\n"
+
+        url = f"https://{API_SERVER}/odata/v2/$batch"
+        response = make_request(
+            url,
+            method='POST',
+            data=body.encode('utf-8'),
+            headers={'Content-Type': f'multipart/mixed; boundary={boundary}'},
+        )
+        response.raise_for_status()
+
+        # Re-wrap the response as a MIME message so the multipart structure
+        # can be parsed with the stdlib email parser.
+        mime = (
+            b"Content-Type: " + response.headers.get('Content-Type', '').encode('ascii')
+            + b"\r\n\r\n" + response.content
+        )
+        message = email.parser.BytesParser().parsebytes(mime)
+        payload = message.get_payload()
+        if not message.is_multipart() or len(payload) != len(entities):
+            raise ValueError(
+                f"Unexpected $batch response: {len(payload) if message.is_multipart() else 0} "
+                f"parts for {len(entities)} requests"
+            )
+
+        contents = []
+        for entity, part in zip(entities, payload):
+            raw = part.get_payload(decode=True)
+            if raw is None:
+                raw = part.get_payload()
+                raw = raw.encode('utf-8') if isinstance(raw, str) else raw
+            # Each part is a serialized HTTP response: status line, headers,
+            # blank line, then the metadata body.
+            head, _, part_body = raw.partition(b"\r\n\r\n")
+            status_line = head.split(b"\r\n", 1)[0]
+            if b" 200 " in status_line + b" ":
+                contents.append(part_body)
+            else:
+                print(f"Failed to fetch metadata for {entity}: {status_line.decode('ascii', 'replace')}")
+                contents.append(None)
+        return contents
+
+    def fetch_metadata(entity):
         url = f"https://{API_SERVER}/odata/v2/{entity}/$metadata"
         print(f"Fetching metadata for {entity}...")
         try:
-            response = make_request(url)
-            if response.status_code == 200:
-                metadata_trees[entity] = ET.ElementTree(ET.fromstring(response.content))
-            else:
-                print(f"Failed to fetch metadata for {entity}: {response.status_code}")
+            response = make_request(url, stream=True)
         except Exception as e:
             print(f"Error fetching metadata for {entity}: {e}")
+            return entity, [], set()
+        try:
+            if response.status_code != 200:
+                print(f"Failed to fetch metadata for {entity}: {response.status_code}")
+                return entity, [], set()
+            # Feed the raw socket stream straight into the parser so parsing
+            # overlaps with the network receive and the body is never
+            # buffered whole.
+            response.raw.decode_content = True
+            return (entity,) + parse_metadata_source(entity, response.raw)
+        finally:
+            response.close()
 
-    # Collect detailed field metadata
     rows = []
     all_attrs = set()
+    batch_contents = None
+    try:
+        batch_contents = fetch_metadata_batch(ENTITY_SETS)
+    except Exception as e:
+        print(f"$batch metadata fetch failed ({e}); falling back to per-entity requests.")
+
+    if batch_contents is not None:
+        for entity, content in zip(ENTITY_SETS, batch_contents):
+            if content is None:
+                continue
+            entity_rows, attrs_seen = parse_metadata_source(entity, io.BytesIO(content))
+            rows.extend(entity_rows)
+            all_attrs |= attrs_seen
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for entity, entity_rows, attrs_seen in executor.map(fetch_metadata, ENTITY_SETS):
+                rows.extend(entity_rows)
+                all_attrs |= attrs_seen
 
-    for tree in metadata_trees.values():
-        root = tree.getroot()
-        for schema in root.findall('.//{http://schemas.microsoft.com/ado/2008/09/edm}Schema'):
-            if schema.attrib.get('Namespace') == 'SFOData':
-                for et in schema.findall('EntityType', ns):
-                    for prop in et.findall('Property', ns):
-                        all_attrs.update([clean_attr(a) for a in prop.attrib.keys()])
-                    for nav in et.findall('NavigationProperty', ns):
-                        all_attrs.update([clean_attr(a) for a in nav.attrib.keys()])
-
-    all_attrs = sorted(all_attrs)
-    all_attrs += ["Key", "Entity", "NavigationField"]
-
-    for tree in metadata_trees.values():
-        root = tree.getroot()
-        for schema in root.findall('.//{http://schemas.microsoft.com/ado/2008/09/edm}Schema'):
-            if schema.attrib.get('Namespace') == 'SFOData':
-                for et in schema.findall('EntityType', ns):
-                    entity_name = et.attrib.get('Name', 'Null')
-                    key_names = set()
-                    key = et.find('Key', ns)
-                    if key is not None:
-                        key_names = {pr.attrib.get('Name') for pr in key.findall('PropertyRef', ns)}
-                    for prop in et.findall('Property', ns):
-                        row = {}
-                        for attr in all_attrs:
-                            if attr in ["Key", "Entity", "NavigationField"]:
-                                continue
-                            row[attr] = get_attr_value(prop, attr)
-                        row["Key"] = "true" if prop.attrib.get("Name") in key_names else "false"
-                        row["Entity"] = entity_name
-                        row["NavigationField"] = "false"
-                        rows.append(row)
-                    for nav in et.findall('NavigationProperty', ns):
-                        row = {}
-                        for attr in all_attrs:
-                            if attr in ["Key", "Entity", "NavigationField"]:
-                                continue
-                            row[attr] = get_attr_value(nav, attr)
-                        row["Key"] = "false"
-                        row["Entity"] = entity_name
-                        row["NavigationField"] = "true"
-                        rows.append(row)
-
-    df_dict = pd.DataFrame(rows, columns=all_attrs)
+    # Project the raw rows straight onto the simple-dictionary columns.
+    # The three bookkeeping columns are always present on every row;
+    # XML-derived attributes default to "Null" when an entity's metadata
+    # does not define them, and columns never seen at all become "".
+    meta_cols = {"Key", "Entity", "NavigationField"}
+    seen_attrs = all_attrs - meta_cols
 
     # Simple EC Data API Dictionary
     simple_cols = [
-        "Entity", "Name", "label", "Type", "Key", "required", "picklist", "MaxLength", 
+        "Entity", "Name", "label", "Type", "Key", "required", "picklist", "MaxLength",
         "NavigationField", "creatable", "updatable", "visible", "filterable", "sortable", "upsertable"
     ]
-    # Ensure columns exist
-    for col in simple_cols:
-        if col not in df_dict.columns:
-            df_dict[col] = ""
-            
-    df_simple = df_dict[simple_cols].copy()
-
-    # Sorting
-    df_simple = df_simple.sort_values(
-        by=["Entity", "Name", "Key", "required"],
-        ascending=[True, True, False, False],
-        key=lambda col: col.map(lambda x: 1 if str(x).lower() == "true" else 0) if col.name in ["Key", "required"] else col
-    ).reset_index(drop=True)
-
-    # Save to Excel
-    with pd.ExcelWriter(EXCEL_OUTPUT_PATH, engine="openpyxl") as writer:
-        df_simple.to_excel(writer, sheet_name="Simple EC Data API Dictionary", index=False)
-    
+    col_kinds = [(c, 0 if c in meta_cols else 1 if c in seen_attrs else 2)
+                 for c in simple_cols]
+    simple_rows = [
+        {c: row[c] if kind == 0 else row.get(c, "Null") if kind == 1 else ""
+         for c, kind in col_kinds}
+        for row in rows
+    ]
+
+    # Sorting: three stable passes give Entity/Name ascending with Key and
+    # required descending, ranking "true" highest and the remaining values
+    # reverse-alphabetically (the same order the previous ordered-
+    # categorical sort produced) so key/required fields come first.
+    def _flag_rank(col):
+        uniq = {str(r[col]) for r in simple_rows}
+        trues = [u for u in uniq if u.lower() == "true"]
+        others = sorted(u for u in uniq if u.lower() != "true")
+        return {u: i for i, u in enumerate(others + trues)}
+
+    for col in ("required", "Key"):
+        rank = _flag_rank(col)
+        simple_rows.sort(key=lambda r: rank[str(r[col])], reverse=True)
+    simple_rows.sort(key=lambda r: (r["Entity"], r["Name"]))
+
+    # Downstream consumers expect plain strings
+    for r in simple_rows:
+        r["Key"] = str(r["Key"])
+        r["required"] = str(r["required"])
+
+    # Save to Excel. A write-only workbook streams rows straight to disk
+    # instead of materializing the full cell grid in memory first.
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Simple EC Data API Dictionary")
+    ws.append(simple_cols)
+    for r in simple_rows:
+        ws.append([r[c] for c in simple_cols])
+    wb.save(EXCEL_OUTPUT_PATH)
+
     print(f"Dictionary saved to {EXCEL_OUTPUT_PATH}")
-    return df_simple
+    return simple_rows
 
 # =============================================================================
 # API Query and Parsing
 # =============================================================================
-def parse_api_response(root_entity, json_data):
-    """Parse JSON response to list fields with attributes and derived entity."""
+# Memo for the %Nav entity-derivation rule: each unique key is inspected and
+# sliced at most once, leaving two dict lookups per key on the hot path.
+_nav_cache = {}
+
+
+def _derive_entity(k, cur):
+    """Return the entity a key switches to: k[:-3] for %Nav keys, else cur."""
+    derived = _nav_cache.get(k)
+    if derived is None:
+        derived = k[:-3] if k.endswith("Nav") else ""
+        _nav_cache[k] = derived
+    return derived or cur
+
+
+_MISSING = object()
+
+
+def _join_path(cons):
+    """Materialize a (tail, component) cons chain into the path string."""
+    parts = []
+    while cons is not None:
+        cons, comp = cons
+        parts.append(comp)
+    parts.reverse()
+    return "".join(parts)
+
+
+def parse_api_response(root_entity, json_data, limit=3):
+    """Parse JSON response to list fields with attributes and derived entity.
+
+    A single explicit-stack pass does double duty: it emits the field
+    table rows (pre-order, from the first result, __metadata skipped,
+    %Nav entity rule applied) and simultaneously builds the truncated
+    sample-response clone (top `limit` items per list) that previously
+    required a second full traversal. Returns (parsed_fields, limited).
+    """
     parsed_fields = []
-    
-    def traverse(data, path, current_entity):
-        if isinstance(data, dict):
-            for k, v in data.items():
-                new_path = f"{path}.{k}"
-                if k == "__metadata":
-                    continue
-                
-                # Determine if this key changes the entity
-                # User rule: sub string of the first level like %Nav queried in path
-                next_entity = current_entity
-                if k.endswith("Nav"):
-                    next_entity = k[:-3]
-                
-                if not isinstance(v, (dict, list)):
-                    parsed_fields.append({
-                        "Entity": current_entity,
-                        "Field": k,
-                        "Index Location": new_path,
-                        "Sample Value": v
-                    })
+    append = parsed_fields.append
+
+    # Locate the subtree that feeds the field table; the clone always
+    # covers the whole payload.
+    doc_node = doc_path = _MISSING
+    d_content = json_data.get('d', _MISSING) if isinstance(json_data, dict) else _MISSING
+    if isinstance(d_content, dict):
+        if 'results' in d_content:
+            results = d_content['results']
+            if isinstance(results, list) and results:
+                # Just take the first item for documentation
+                doc_node, doc_path = results[0], "d.results[]"
+        elif 'result' in d_content:
+            doc_node, doc_path = d_content['result'], "d.result"
+        else:
+            doc_node, doc_path = d_content, "d"
+
+    doc_cons = None if doc_path is _MISSING else (None, doc_path)
+
+    # Stack entries: (src, parent, slot, path, entity, field). parent/slot
+    # say where the node's clone goes (slot None appends to a list parent;
+    # parent None keeps the node for parsing only, i.e. list items past the
+    # clone limit). path is None outside the documented subtree; inside it,
+    # path is a (tail, component) cons chain so siblings share their prefix
+    # and the full string is only joined when a leaf is emitted. Leaves
+    # carry their key in field so they can be emitted when popped.
+    holder = [None]
+    stack = [(json_data, holder, 0, None, None, None)]
+    # Bind the names the loop touches per node to locals; global/builtin
+    # lookups add up over hundreds of thousands of nodes.
+    pop = stack.pop
+    extend = stack.extend
+    derive_entity = _derive_entity
+    dict_cls, list_cls = dict, list
+    container_types = (dict, list)
+    while stack:
+        src, parent, slot, path, entity, field = pop()
+        if isinstance(src, dict_cls):
+            clone = {}
+            if parent is not None:
+                if slot is None:
+                    parent.append(clone)
                 else:
-                    traverse(v, new_path, next_entity)
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                new_path = f"{path}[{i}]" # or [] if we want generic
-                traverse(item, new_path, current_entity)
-
-    d_content = json_data.get('d', {})
-    if 'results' in d_content:
-        results = d_content['results']
-        if isinstance(results, list) and results:
-            # Just take the first item for documentation
-            traverse(results[0], "d.results[]", root_entity)
-    elif 'result' in d_content:
-        result = d_content['result']
-        traverse(result, "d.result", root_entity)
-    else:
-        traverse(d_content, "d", root_entity)
-        
-    return parsed_fields
+                    parent[slot] = clone
+            pending = []
+            add = pending.append
+            for k, v in src.items():
+                if path is not None and k != "__metadata":
+                    new_path = (path, f".{k}")
+                    if isinstance(v, container_types):
+                        # User rule: a key like %Nav switches the entity
+                        add((v, clone, k, new_path,
+                             derive_entity(k, entity), None))
+                    else:
+                        add((v, clone, k, new_path, entity, k))
+                elif v is doc_node:
+                    add((v, clone, k, doc_cons, root_entity, None))
+                else:
+                    add((v, clone, k, None, None, None))
+            extend(reversed(pending))
+        elif isinstance(src, list_cls):
+            clone = []
+            if parent is not None:
+                if slot is None:
+                    parent.append(clone)
+                else:
+                    parent[slot] = clone
+            pending = []
+            add = pending.append
+            for i, item in enumerate(src):
+                item_parent = clone if i < limit else None
+                if item is doc_node:
+                    add((item, item_parent, None, doc_cons,
+                         root_entity, None))
+                elif path is not None and i == 0:
+                    # Fields are schema-wide, so the first item of a nested
+                    # collection is enough for discovery; later items are
+                    # only kept (up to the limit) for the sample clone.
+                    add((item, item_parent, None, (path, "[0]"),
+                         entity, None))
+                elif item_parent is not None:
+                    add((item, item_parent, None, None, None, None))
+            extend(reversed(pending))
+        else:
+            if parent is not None:
+                if slot is None:
+                    parent.append(src)
+                else:
+                    parent[slot] = src
+            if field is not None:
+                append({
+                    "Entity": entity,
+                    "Field": field,
+                    "Index Location": _join_path(path),
+                    "Sample Value": src
+                })
+
+    return parsed_fields, holder[0]
+
+
+def parse_api_response_stream(root_entity, stream, limit=3):
+    """Streaming twin of parse_api_response built on ijson events.
+
+    Produces the same (parsed_fields, limited) outputs without ever
+    materializing the full payload: leaves are emitted as their events
+    stream past and only the first `limit` items of each list are cloned,
+    so the untruncated tail of a large result set never becomes Python
+    objects at all.
+    """
+    parsed_fields = []
+    append = parsed_fields.append
+    holder = [None]
+
+    # Frames: [is_map, clone, path, entity, key_or_index, is_d, doc_key].
+    # path is None outside the documented subtree and a (tail, component)
+    # cons chain inside it, joined only at leaf emission. The frame for the top
+    # 'd' object starts as the presumed doc root (is_d=1); seeing a
+    # results/result key discards the tentative fields and moves the doc
+    # root to that child, matching the in-memory precedence.
+    stack = []
+    push = stack.append
+    pop = stack.pop
+
+    def attach(value):
+        """Place value in the limited clone; False means discarded."""
+        if not stack:
+            holder[0] = value
+            return True
+        top = stack[-1]
+        if top[0]:  # map parent
+            if top[1] is not None:
+                top[1][top[4]] = value
+                return True
+            return False
+        i = top[4]
+        top[4] = i + 1
+        if top[1] is not None and i < limit:
+            top[1].append(value)
+            return True
+        return False
+
+    for _, event, value in ijson.parse(stream, use_float=True):
+        if event == 'map_key':
+            top = stack[-1]
+            top[4] = value
+            if top[5] and value in ('results', 'result'):
+                # d wraps a result set after all; drop the tentative
+                # interpretation of d itself as the documented object.
+                del parsed_fields[:]
+                top[2] = None
+                top[5] = 0
+                top[6] = value
+        elif event == 'start_map' or event == 'start_array':
+            # Work out the child's parse context from its parent frame.
+            path = entity = None
+            is_d = 0
+            results_doc = False
+            if stack:
+                top = stack[-1]
+                if top[0]:
+                    k = top[4]
+                    if top[2] is not None and k != '__metadata':
+                        path = (top[2], f".{k}")
+                        entity = _derive_entity(k, top[3])
+                    elif top[6] is not None and k == top[6]:
+                        if top[6] == 'result':
+                            path, entity = (None, 'd.result'), root_entity
+                        elif event == 'start_array':
+                            results_doc = True
+                    elif len(stack) == 1 and k == 'd' and event == 'start_map':
+                        path, entity, is_d = (None, 'd'), root_entity, 1
+                else:
+                    i = top[4]
+                    if top[6] and i == 0:
+                        # Just take the first item for documentation
+                        path, entity = (None, 'd.results[]'), root_entity
+                    elif top[2] is not None and i == 0:
+                        # First item only: fields are schema-wide, later
+                        # items add no new ones.
+                        path = (top[2], "[0]")
+                        entity = top[3]
+            if event == 'start_map':
+                clone = {}
+                if not attach(clone):
+                    clone = None
+                push([1, clone, path, entity, None, is_d, None])
+            else:
+                clone = []
+                if not attach(clone):
+                    clone = None
+                push([0, clone, path, entity, 0, 0, results_doc])
+        elif event == 'end_map' or event == 'end_array':
+            pop()
+        else:  # scalar: string / number / boolean / null
+            top = stack[-1] if stack else None
+            attach(value)
+            if (top is not None and top[0] and top[2] is not None
+                    and top[4] != '__metadata'):
+                append({
+                    "Entity": top[3],
+                    "Field": top[4],
+                    "Index Location": f"{_join_path(top[2])}.{top[4]}",
+                    "Sample Value": value
+                })
+
+    return parsed_fields, holder[0]
 
 def main():
     print("Starting SuccessFactors API Documentation Generator...")
     
-    # 0. Authenticate
-    global DYNAMIC_ACCESS_TOKEN
-    assertion = get_assertion()
-    if assertion:
-        DYNAMIC_ACCESS_TOKEN = get_access_token(assertion)
-        if DYNAMIC_ACCESS_TOKEN:
-            print("Successfully obtained dynamic OAuth 2.0 token.")
-        else:
-            print("Failed to obtain access token. Will try fallback methods.")
+    # 0. Authenticate (token is cached and auto-refreshed by make_request)
+    if get_or_refresh_token():
+        print("Successfully obtained dynamic OAuth 2.0 token.")
     else:
-        print("Failed to obtain assertion. Will try fallback methods.")
+        print("Failed to obtain dynamic token. Will try fallback methods.")
     
     # 1. Extract Metadata
-    df_dictionary = extract_ec_odata_api_dictionary()
-    
-    # Create lookup dictionary: (Entity, Name) -> Row Series
-    dict_lookup = {}
-    field_lookup = {} # Fallback
+    dictionary_records = extract_ec_odata_api_dictionary()
     
-    for idx, row in df_dictionary.iterrows():
-        dict_lookup[(row['Entity'], row['Name'])] = row
-        field_lookup[row['Name']] = row 
-        
+    # Create lookup dictionaries: (Entity, Name) -> record dict. The
+    # extractor already returns plain row dicts, so this is a single pass.
+    dict_lookup = {(r['Entity'], r['Name']): r for r in dictionary_records}
+    field_lookup = {r['Name']: r for r in dictionary_records} # Fallback
+
+
     print("Step 1: Metadata Extraction Completed.")
 
     # 2. Query API and Generate Sheets
@@ -404,195 +869,348 @@ def main():
     except Exception as e:
         print(f"Warning: Could not load SF Master Table List: {e}")
 
-    # Create new workbook for output
-    template_wb.save(output_filename)
-    wb = openpyxl.load_workbook(output_filename)
-    template_ws = wb["API Template"]
-    output_master_ws = wb["SF Master Table List"]
+    # The output is built as a write-only workbook: every sheet is streamed
+    # row by row, which avoids materializing per-cell objects (the slowest
+    # openpyxl path) and keeps memory near-constant. Query results are
+    # collected first so the master sheets can be written with their sample
+    # responses and cleanup filters in a single pass at the end.
 
-    used_dict_keys = set()
+    _KEEP = object()  # sentinel: keep the template cell's own value
 
-    for metadata in queries_to_run:
-        entity = metadata["entity"]
-        print(f"Processing {entity} ({metadata['api_name']})...")
-        
-        template_url = metadata["endpoint"]
-        
-        # Use template from Master Table
-        # It might contain {Test_API-Server} placeholder
-        today_str = datetime.now().strftime('%Y-%m-%d')
-        endpoint = template_url.replace("{{Test_API-Server}}", API_SERVER)\
-                               .replace("{Test_API-Server}", API_SERVER)\
-                               .replace("{today}", today_str)
-            
-        # Query API
+    def clone_cell(out_ws, src_cell, value=_KEEP):
+        cell = WriteOnlyCell(out_ws, value=src_cell.value if value is _KEEP else value)
+        if src_cell.has_style:
+            cell.font = copy(src_cell.font)
+            cell.fill = copy(src_cell.fill)
+            cell.border = copy(src_cell.border)
+            cell.alignment = copy(src_cell.alignment)
+            cell.number_format = src_cell.number_format
+        return cell
+
+    def copy_template_sheet(out_wb, src_ws, title=None, overrides=None,
+                            max_row=None, extra_rows=None):
+        """Stream a styled copy of src_ws into the write-only workbook.
+
+        overrides maps (row, column) to replacement values; extra_rows are
+        plain value tuples appended after the copied region.
+        """
+        ws = out_wb.create_sheet(title or src_ws.title)
+        for col, dim in src_ws.column_dimensions.items():
+            ws.column_dimensions[col].width = dim.width
+        # Row heights must be registered before the rows are appended: the
+        # write-only writer reads row_dimensions as each row streams out.
+        for r, dim in src_ws.row_dimensions.items():
+            if dim.height is not None:
+                ws.row_dimensions[r].height = dim.height
+        ws.freeze_panes = src_ws.freeze_panes
+        if src_ws.auto_filter.ref:
+            ws.auto_filter.ref = src_ws.auto_filter.ref
+        overrides = overrides or {}
+        for src_row in src_ws.iter_rows(min_row=1, max_row=max_row):
+            ws.append([
+                clone_cell(ws, c, overrides.get((c.row, c.column), _KEEP))
+                for c in src_row
+            ])
+        for row in (extra_rows or ()):
+            ws.append(row)
+        for mc in src_ws.merged_cells.ranges:
+            ws.merged_cells.ranges.add(CellRange(mc.coord))
+        return ws
+
+    # The whole API Template sheet is replayed once per entity. Capture its
+    # values, style objects, merges and column widths a single time so each
+    # entity sheet just clones from the cache instead of re-walking (and
+    # re-copying the styles of) the template worksheet. The tail below the
+    # field-table header (rows 14+) is cached too: it carries the styled
+    # grid and the response-status legend in N14:P17, which the field rows
+    # (columns A-K) are merged into rather than replacing.
+    def _cache_rows(min_row, max_row=None):
+        return [
+            [(c.row, c.column, c.value,
+              (copy(c.font), copy(c.fill), copy(c.border), copy(c.alignment),
+               c.number_format) if c.has_style else None)
+             for c in src_row]
+            for src_row in template_ws.iter_rows(min_row=min_row,
+                                                 max_row=max_row)
+        ]
+
+    _tmpl_widths = [(col, dim.width)
+                    for col, dim in template_ws.column_dimensions.items()]
+    _tmpl_heights = [(r, dim.height)
+                     for r, dim in template_ws.row_dimensions.items()
+                     if dim.height is not None]
+    _tmpl_merges = [mc.coord for mc in template_ws.merged_cells.ranges]
+    _tmpl_header = _cache_rows(1, 13)
+    _tmpl_tail = _cache_rows(14)
+
+    def write_entity_sheet(out_wb, title, overrides, field_rows):
+        """Replay the cached API Template sheet with the fields merged in."""
+        ws = out_wb.create_sheet(title)
+        for col, width in _tmpl_widths:
+            ws.column_dimensions[col].width = width
+        for r, height in _tmpl_heights:
+            ws.row_dimensions[r].height = height
+        for cached_row in _tmpl_header:
+            out_row = []
+            for row, column, value, style in cached_row:
+                v = overrides.get((row, column), _KEEP)
+                cell = WriteOnlyCell(ws, value=value if v is _KEEP else v)
+                if style is not None:
+                    (cell.font, cell.fill, cell.border, cell.alignment,
+                     cell.number_format) = style
+                out_row.append(cell)
+            ws.append(out_row)
+        # Field rows overlay the template tail: field values win in their
+        # columns, the template keeps everything else (legend, borders).
+        # Rows past the template tail are appended as plain values.
+        n_fields = len(field_rows)
+        for i in range(max(len(_tmpl_tail), n_fields)):
+            if i >= len(_tmpl_tail):
+                ws.append(field_rows[i])
+                continue
+            fr = field_rows[i] if i < n_fields else ()
+            fr_len = len(fr)
+            out_row = []
+            for row, column, value, style in _tmpl_tail[i]:
+                idx = column - 1
+                if idx < fr_len and fr[idx] is not None:
+                    value = fr[idx]
+                cell = WriteOnlyCell(ws, value=value)
+                if style is not None:
+                    (cell.font, cell.fill, cell.border, cell.alignment,
+                     cell.number_format) = style
+                out_row.append(cell)
+            ws.append(out_row)
+        for coord in _tmpl_merges:
+            ws.merged_cells.ranges.add(CellRange(coord))
+        return ws
+
+    # Endpoint templates from the Master Table may contain
+    # {Test_API-Server} / {today} placeholders. The substitution values are
+    # loop-invariant, so resolve them once and collapse the three chained
+    # .replace calls into a single precompiled-regex pass.
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    placeholder_values = {
+        "{{Test_API-Server}}": API_SERVER,
+        "{Test_API-Server}": API_SERVER,
+        "{today}": today_str,
+    }
+
+    def render_endpoint(template_url):
+        # The pattern also matches unbalanced brace variants; leave those
+        # untouched like the old chained .replace calls did.
+        return _PLACEHOLDER_RE.sub(
+            lambda m: placeholder_values.get(m.group(0), m.group(0)),
+            template_url)
+
+    # Phase 1a: fetch every endpoint concurrently. Network latency dominates
+    # the query loop and the requests are independent; SESSION's pooled
+    # adapter reuses TCP/TLS connections across workers. openpyxl is not
+    # thread-safe, so sheet assembly stays serial in phase 1b.
+    def fetch_endpoint(task):
+        entity, endpoint = task
         try:
+            if ijson is not None:
+                # Parse the response incrementally off the wire; the full
+                # payload is never held as one nested dict.
+                try:
+                    resp = make_request(endpoint, stream=True)
+                    try:
+                        resp.raise_for_status()
+                        resp.raw.decode_content = True
+                        return parse_api_response_stream(entity, resp.raw)
+                    finally:
+                        resp.close()
+                except Exception as e:
+                    # ijson is stricter than the stdlib parser (no NaN or
+                    # Infinity, 64-bit integer limit), so retry buffered
+                    # rather than settling for an empty field table.
+                    print(f"Streaming parse failed for {entity} ({e}); "
+                          f"retrying with buffered parse.")
             resp = make_request(endpoint)
             resp.raise_for_status()
-            json_data = resp.json()
+            parsed_fields, json_data_limited = parse_api_response(
+                entity, json_loads(resp.content))
         except Exception as e:
             print(f"Error querying {entity}: {e}")
-            json_data = {}
-            
-        # Parse Response
-        parsed_fields = parse_api_response(entity, json_data)
-        
-        # Create Sheet
+            parsed_fields, json_data_limited = [], {}
+        return parsed_fields, json_data_limited
+
+    # Master rows that render to the same endpoint (common with {today}
+    # variants) are fetched and parsed once and share the cached result.
+    # The cache key includes the root entity since it shapes the parsed
+    # field rows.
+    fetch_keys = {
+        metadata["row_idx"]: (metadata["entity"],
+                              render_endpoint(metadata["endpoint"]))
+        for metadata in queries_to_run
+    }
+    unique_tasks = list(dict.fromkeys(fetch_keys.values()))
+    endpoint_cache = {}
+    if unique_tasks:
+        workers = min(MAX_WORKERS, len(unique_tasks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for task, result in zip(unique_tasks,
+                                    executor.map(fetch_endpoint, unique_tasks)):
+                endpoint_cache[task] = result
+    query_results = {row_idx: (task[1],) + endpoint_cache[task]
+                     for row_idx, task in fetch_keys.items()}
+
+    # Phase 1b: consume the fetched responses and collect the sheet payloads.
+    used_dict_keys = set()
+    entity_sheets = {}       # sheet name -> (header overrides, field rows)
+    master_overrides = {}    # (row, column) -> sample response for master list
+
+    # Memo for resolved field metadata: names like id/status/externalCode
+    # recur across entities and sheets, and a hit skips the two-stage
+    # lookup fall-through and the per-field attribute indexing.
+    resolved = {}
+
+    for metadata in queries_to_run:
+        entity = metadata["entity"]
+        print(f"Processing {entity} ({metadata['api_name']})...")
+
+        # Responses were parsed (and their samples limited) in the fetch
+        # workers; only the pretty-print and sheet assembly remain here.
+        endpoint, parsed_fields, json_data_limited = query_results[metadata["row_idx"]]
+        json_str = json_dumps(json_data_limited)
+
         sheet_name_raw = metadata["api_name"] if metadata["api_name"] else entity
         sheet_name = sheet_name_raw[:31] # Max 31 chars
-        if sheet_name in wb.sheetnames:
-            del wb[sheet_name]
-        
-        ws = wb.copy_worksheet(template_ws)
-        ws.title = sheet_name
-        print(f"Created sheet: {sheet_name}")
-        
-        # Limit JSON data for documentation (Top 3 items in lists)
-        def limit_json_data(data, limit=3):
-            if isinstance(data, dict):
-                return {k: limit_json_data(v, limit) for k, v in data.items()}
-            elif isinstance(data, list):
-                return [limit_json_data(i, limit) for i in data[:limit]]
-            else:
-                return data
-        
-        json_data_limited = limit_json_data(json_data)
-        json_str = json.dumps(json_data_limited, indent=4)
-        
-        # Fill Header Info in Entity Sheet
-        ws["A1"] = metadata["api_name"]   # API Name
-        ws["B2"] = metadata["data_flow"]  # Data Flow
-        ws["B3"] = metadata["trigger"]    # Trigger Point
-        ws["B4"] = entity                 # Start Entity
-        ws["B5"] = metadata["intro"]      # Introduction
-        ws["B6"] = endpoint               # Test API Endpoint
-        
-        # Fill Sample Response (B12)
-        ws["B12"] = json_str
-        
-        # Write Sample Response to SF Master Table List (Column L -> 12)
-        output_master_ws.cell(row=metadata["row_idx"], column=12, value=json_str)
-        
-        # Fill Fields
-        start_row = 14
-        for i, field_data in enumerate(parsed_fields):
-            row_num = start_row + i
+
+        # Build the field table rows (written from row 14; column A is part
+        # of the merged template border, so it stays empty).
+        # Columns: Field B, Entity C, Path D, Sample Value E, Label F,
+        # Type G, Key H, Required I, Picklist J, MaxLength K
+        field_rows = []
+        add_field_row = field_rows.append
+        for field_data in parsed_fields:
             field_name = field_data["Field"]
             index_loc = field_data["Index Location"]
             field_entity = field_data["Entity"]
             sample_val = field_data["Sample Value"]
-            
-            # Lookup attributes using derived entity
-            meta = dict_lookup.get((field_entity, field_name))
-            if meta is None:
-                # Fallback to field lookup if exact match fails
-                meta = field_lookup.get(field_name)
-            
-            label = meta["label"] if meta is not None else ""
-            type_ = meta["Type"] if meta is not None else ""
-            max_len = meta["MaxLength"] if meta is not None else ""
-            picklist = meta["picklist"] if meta is not None else ""
-            key = meta["Key"] if meta is not None else ""
-            required = meta["required"] if meta is not None else ""
+
+            # Lookup attributes using derived entity, memoized per
+            # (entity, field). None (not "") for missing attributes: a None
+            # cell is simply not emitted in the saved XML, while "" still
+            # costs a <c> element per cell.
+            cache_key = (field_entity, field_name)
+            cached = resolved.get(cache_key)
+            if cached is None:
+                meta = dict_lookup.get(cache_key)
+                if meta is None:
+                    # Fallback to field lookup if exact match fails
+                    meta = field_lookup.get(field_name)
+                if meta is not None:
+                    cached = ((meta["label"], meta["Type"], meta["MaxLength"],
+                               meta["picklist"], meta["Key"], meta["required"]),
+                              (meta["Entity"], meta["Name"]))
+                else:
+                    cached = ((None, None, None, None, None, None), None)
+                resolved[cache_key] = cached
+            (label, type_, max_len, picklist, key, required), meta_key = cached
 
             # Standardize logic: Add to used keys to prevent deletion in cleanup step
             # We add both the derived entity/field and the matched metadata entity/field (if any)
             # to ensure we preserve the relevant rows in the master dictionary even if naming varies slightly.
-            used_dict_keys.add((field_entity, field_name))
-            if meta is not None:
-                used_dict_keys.add((meta["Entity"], meta["Name"]))
-            
-            # Update Column Mapping based on Row 13 of Template
-            # Field: B (2)
-            # Entity: C (3)
-            # Path: D (4)
-            # Sample Value: E (5)
-            # Label: F (6)
-            # Type: G (7)
-            # Key: H (8)
-            # Required: I (9)
-            # Picklist: J (10)
-            # MaxLength: K (11)
-            
-            ws.cell(row=row_num, column=2, value=field_name)
-            ws.cell(row=row_num, column=3, value=field_entity) # Entity in C
-            ws.cell(row=row_num, column=4, value=index_loc)    # Path in D
-            ws.cell(row=row_num, column=5, value=str(sample_val) if sample_val is not None else "") # Sample Value in E
-            ws.cell(row=row_num, column=6, value=label)
-            ws.cell(row=row_num, column=7, value=type_)
-            ws.cell(row=row_num, column=8, value=key)
-            ws.cell(row=row_num, column=9, value=required)
-            ws.cell(row=row_num, column=10, value=picklist)
-            ws.cell(row=row_num, column=11, value=max_len)
-            
-            ws.cell(row=row_num, column=11, value=max_len)
-    
+            used_dict_keys.add(cache_key)
+            if meta_key is not None:
+                used_dict_keys.add(meta_key)
+
+            # Numerics/booleans go through natively so the cells stay
+            # usable in Excel; everything else is stringified as before.
+            if sample_val is None:
+                sample_repr = None
+            elif isinstance(sample_val, (int, float, bool)):
+                sample_repr = sample_val
+            else:
+                sample_repr = str(sample_val)
+
+            add_field_row((
+                None, field_name, field_entity, index_loc, sample_repr,
+                label, type_, key, required, picklist, max_len,
+            ))
+
+        header_overrides = {
+            (1, 1): metadata["api_name"],   # A1: API Name
+            (2, 2): metadata["data_flow"],  # B2: Data Flow
+            (3, 2): metadata["trigger"],    # B3: Trigger Point
+            (4, 2): entity,                 # B4: Start Entity
+            (5, 2): metadata["intro"],      # B5: Introduction
+            (6, 2): endpoint,               # B6: Test API Endpoint
+            (12, 2): json_str,              # B12: Sample Response
+        }
+        # A replaced sheet moves to the end, like the old delete-and-recreate
+        entity_sheets.pop(sheet_name, None)
+        entity_sheets[sheet_name] = (header_overrides, field_rows)
+
+        # Sample Response goes to SF Master Table List (Column L -> 12)
+        master_overrides[(metadata["row_idx"], 12)] = json_str
+
     # =============================================================================
-    # Cleanup Unused Fields from Dictionaries
+    # Phase 2: stream all sheets into the output workbook
     # =============================================================================
     print("Cleaning up unused fields in Master Dictionary and Dropdown Mapping...")
 
-    # 1. Cleanup SF Master Data Dictionary
-    if "SF Master Data Dictionary" in wb.sheetnames:
-        ws_dict = wb["SF Master Data Dictionary"]
-        rows = list(ws_dict.iter_rows(values_only=True))
-        if rows:
-            header = rows[0]
-            data = rows[1:]
-            try:
-                # Identify columns. Assuming Entity is A and Field is B based on user info.
-                # However, robustly finding them by name is better.
-                # Standard headers: Entity, Field
-                ent_idx = header.index("Entity")
-                field_idx = header.index("Field")
-                
-                filtered_rows = [header]
-                kept_count = 0
-                for r in data:
-                    if len(r) > max(ent_idx, field_idx):
-                        key = (r[ent_idx], r[field_idx])
-                        if key in used_dict_keys:
-                            filtered_rows.append(r)
-                            kept_count += 1
-                
-                # Clear and Write back
-                ws_dict.delete_rows(1, amount=ws_dict.max_row)
-                for r in filtered_rows:
-                    ws_dict.append(r)
-                print(f"SF Master Data Dictionary cleaned. Kept {kept_count} rows.")
-            except ValueError:
-                print("Warning: 'Entity' or 'Field' column not found in SF Master Data Dictionary.")
-
-    # 2. Cleanup SF DropdownList Mapping
-    if "SF DropdownList Mapping" in wb.sheetnames:
-        ws_drop = wb["SF DropdownList Mapping"]
-        rows = list(ws_drop.iter_rows(values_only=True))
-        if rows:
-            header = rows[0]
-            data = rows[1:]
-            try:
-                # Standard headers: Entity, Name
-                ent_idx = header.index("Entity")
-                name_idx = header.index("Name")
-                
-                filtered_rows = [header]
-                kept_count = 0
-                for r in data:
-                    if len(r) > max(ent_idx, name_idx):
-                        key = (r[ent_idx], r[name_idx])
-                        if key in used_dict_keys:
-                            filtered_rows.append(r)
-                            kept_count += 1
-                
-                # Clear and Write back
-                ws_drop.delete_rows(1, amount=ws_drop.max_row)
-                for r in filtered_rows:
-                    ws_drop.append(r)
-                print(f"SF DropdownList Mapping cleaned. Kept {kept_count} rows.")
-            except ValueError:
-                print("Warning: 'Entity' or 'Name' column not found in SF DropdownList Mapping.")
-
-    wb.save(output_filename)
+    # Flatten the referenced (entity, field) pairs to single strings once:
+    # the per-row membership test below then hashes one string instead of
+    # allocating and hashing a two-tuple for every dictionary row.
+    used_keys_str = {f"{e}\x00{f}" for e, f in used_dict_keys}
+
+    def filtered_sheet_rows(src_ws, key_cols, label):
+        """Yield the header plus only the data rows whose key pair was
+        referenced, streaming row by row so the source sheet is never
+        materialized as a list."""
+        rows = src_ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield header
+        try:
+            idxs = [header.index(c) for c in key_cols]
+        except ValueError:
+            print(f"Warning: {key_cols[0]!r} or {key_cols[1]!r} column not found in {label}.")
+            yield from rows
+            return
+        i, j = idxs
+        min_len = max(idxs) + 1
+        kept = 0
+        for r in rows:
+            if len(r) >= min_len and f"{r[i]}\x00{r[j]}" in used_keys_str:
+                kept += 1
+                yield r
+        print(f"{label} cleaned. Kept {kept} rows.")
+
+    def write_filtered_sheet(out_wb, src_ws, key_cols, name):
+        ws = out_wb.create_sheet(name)
+        n_rows = 0
+        for r in filtered_sheet_rows(src_ws, key_cols, name):
+            ws.append(r)
+            n_rows += 1
+        # Keep the source sheet's auto-filter, shrunk to the rows kept.
+        if src_ws.auto_filter.ref and n_rows:
+            src_rng = CellRange(src_ws.auto_filter.ref)
+            ws.auto_filter.ref = CellRange(
+                min_col=src_rng.min_col, min_row=1,
+                max_col=src_rng.max_col, max_row=n_rows).coord
+
+    out_wb = openpyxl.Workbook(write_only=True)
+    for name in template_wb.sheetnames:
+        src_ws = template_wb[name]
+        if name == "SF Master Table List":
+            copy_template_sheet(out_wb, src_ws, overrides=master_overrides)
+        elif name == "SF Master Data Dictionary":
+            write_filtered_sheet(out_wb, src_ws, ("Entity", "Field"), name)
+        elif name == "SF DropdownList Mapping":
+            write_filtered_sheet(out_wb, src_ws, ("Entity", "Name"), name)
+        else:
+            copy_template_sheet(out_wb, src_ws)
+
+    for sheet_name, (header_overrides, field_rows) in entity_sheets.items():
+        write_entity_sheet(out_wb, sheet_name, header_overrides, field_rows)
+        print(f"Created sheet: {sheet_name}")
+
+    out_wb.save(output_filename)
     print(f"Documentation generated: {output_filename}")
 
 if __name__ == "__main__":